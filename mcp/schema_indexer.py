@@ -1,16 +1,31 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import hashlib
 import json
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Iterable, List, Sequence
 
 import numpy as np
 from graphql import GraphQLList, GraphQLNonNull, GraphQLObjectType, build_schema
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI, RateLimitError
 from dotenv import load_dotenv
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 load_dotenv()
 DEFAULT_DATA_DIR = Path(__file__).parent / "data"
 DEFAULT_SCHEMA_PATH = Path(__file__).parent / "schema.graphql"
@@ -24,11 +39,14 @@ class TypeField:
     summary: str
 
 
+# Cached by type identity: graphql-core types are singletons within a schema,
+# and the same wrappers (e.g. `ID!`) recur across many fields and args.
+@functools.lru_cache(maxsize=8192)
 def describe_type(graphql_type) -> str:
     if isinstance(graphql_type, GraphQLNonNull):
-        return f"{describe_type(graphql_type.of_type)}!"
+        return describe_type(graphql_type.of_type) + "!"
     if isinstance(graphql_type, GraphQLList):
-        return f"[{describe_type(graphql_type.of_type)}]"
+        return "".join(("[", describe_type(graphql_type.of_type), "]"))
     return str(graphql_type)
 
 
@@ -43,27 +61,26 @@ def flatten_schema(schema_text: str) -> List[TypeField]:
             continue
 
         for field_name, field in sorted(gql_type.fields.items()):
-            arg_parts = [
-                f"{arg_name}: {describe_type(arg.type)}"
-                for arg_name, arg in field.args.items()
-            ]
-            arg_list = ", ".join(arg_parts)
             return_type = describe_type(field.type)
-            signature = (
-                f"{type_name}.{field_name}({arg_list}) -> {return_type}"
-                if arg_list
-                else f"{type_name}.{field_name} -> {return_type}"
-            )
+            if field.args:
+                arg_list = ", ".join(
+                    "".join((arg_name, ": ", describe_type(arg.type)))
+                    for arg_name, arg in field.args.items()
+                )
+                summary = "".join(
+                    (type_name, ".", field_name, "(", arg_list, ") -> ", return_type)
+                )
+            else:
+                summary = "".join((type_name, ".", field_name, " -> ", return_type))
 
-            summary_parts = [signature]
             if field.description:
-                summary_parts.append(f"desc: {field.description}")
+                summary = "".join((summary, " | desc: ", field.description))
 
             type_fields.append(
                 TypeField(
                     type_name=type_name,
                     field_name=field_name,
-                    summary=" | ".join(summary_parts),
+                    summary=summary,
                 )
             )
 
@@ -71,41 +88,160 @@ def flatten_schema(schema_text: str) -> List[TypeField]:
 
 
 class OpenAIEmbedder:
+    QUERY_CACHE_SIZE = 1024
+    BATCH_SIZE = 512
+    MAX_CONCURRENCY = 8
+    MAX_RETRIES = 5
+
     def __init__(self, model: str = DEFAULT_EMBED_MODEL):
         self.client = OpenAI()
         self.model = model
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        # embed_one runs from concurrent MCP worker threads; guard the
+        # OrderedDict so a hit's move_to_end can't race an eviction.
+        self._query_cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def embed_many(self, texts: Sequence[str]) -> np.ndarray:
         if not texts:
             return np.zeros((0, 0), dtype=np.float32)
 
-        response = self.client.embeddings.create(model=self.model, input=list(texts))
-        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        texts = list(texts)
+        if len(texts) <= self.BATCH_SIZE:
+            response = self.client.embeddings.create(model=self.model, input=texts)
+            vectors = np.array(
+                [item.embedding for item in response.data], dtype=np.float32
+            )
+            return self._normalize(vectors)
+
+        chunks = [
+            texts[start : start + self.BATCH_SIZE]
+            for start in range(0, len(texts), self.BATCH_SIZE)
+        ]
+        vectors = np.vstack(asyncio.run(self._embed_chunks(chunks)))
         return self._normalize(vectors)
 
+    async def _embed_chunks(self, chunks: list[list[str]]) -> list[np.ndarray]:
+        client = AsyncOpenAI()
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        try:
+            return await asyncio.gather(
+                *(self._embed_chunk(client, chunk, semaphore) for chunk in chunks)
+            )
+        finally:
+            await client.close()
+
+    async def _embed_chunk(
+        self,
+        client: AsyncOpenAI,
+        chunk: list[str],
+        semaphore: asyncio.Semaphore,
+    ) -> np.ndarray:
+        async with semaphore:
+            delay = 1.0
+            for attempt in range(self.MAX_RETRIES):
+                try:
+                    response = await client.embeddings.create(
+                        model=self.model, input=chunk
+                    )
+                except RateLimitError:
+                    if attempt == self.MAX_RETRIES - 1:
+                        raise
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                else:
+                    return np.array(
+                        [item.embedding for item in response.data], dtype=np.float32
+                    )
+
     def embed_one(self, text: str) -> np.ndarray:
-        return self.embed_many([text])[0]
+        key = " ".join(text.strip().lower().split())
+        with self._query_cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._cache_hits += 1
+                self._query_cache.move_to_end(key)
+                return cached
+            self._cache_misses += 1
+
+        # The API call happens outside the lock; concurrent misses on the
+        # same key just embed twice and the last write wins.
+        vector = self.embed_many([text])[0]
+        with self._query_cache_lock:
+            self._query_cache[key] = vector
+            if len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def get_stats(self) -> dict:
+        return {
+            "query_cache_size": len(self._query_cache),
+            "query_cache_hits": self._cache_hits,
+            "query_cache_misses": self._cache_misses,
+        }
 
     @staticmethod
     def _normalize(vectors: np.ndarray) -> np.ndarray:
-        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
-        norms[norms == 0] = 1.0
-        return vectors / norms
+        # Single fused pass for the squared norms, then scale by the
+        # reciprocal root (one multiply per element instead of a divide).
+        squared = np.einsum("ij,ij->i", vectors, vectors)
+        squared[squared == 0] = 1.0
+        return vectors * (1.0 / np.sqrt(squared))[:, None]
 
 
 class EmbeddingStore:
-    def __init__(self, data_dir: Path, embedding_model: str):
+    # Quantization scale for unit-norm components in [-1, 1].
+    INT8_SCALE = 127.0
+    # How many quantized candidates to rescore per requested result.
+    RERANK_FACTOR = 4
+    # Above this many vectors, switch the FAISS index from an exact flat
+    # scan to an HNSW graph (sublinear search, approximate recall).
+    HNSW_THRESHOLD = 10_000
+    HNSW_M = 32
+
+    def __init__(self, data_dir: Path, embedding_model: str, quantized: bool | None = None):
         self.data_dir = data_dir
         self.embedding_model = embedding_model
         self.meta_path = data_dir / "metadata.json"
-        self.vectors_path = data_dir / "vectors.npz"
+        self.items_path = data_dir / "items.json"
+        self.vectors_path = data_dir / "vectors.npy"
+        self.vectors_int8_path = data_dir / "vectors_int8.npy"
+        self.faiss_index_path = data_dir / "index.faiss"
+        # Older indexes stored a compressed archive; still readable on load.
+        self.legacy_vectors_path = data_dir / "vectors.npz"
+        if quantized is None:
+            quantized = os.environ.get("GRAPHQL_INDEX_INT8") == "1"
+        self.quantized = quantized
 
         self._vectors: np.ndarray | None = None
+        self._vectors_int8: np.ndarray | None = None
         self._items: list[dict] | None = None
         self._meta: dict | None = None
+        self._faiss_index = None
+        # Buffers are per thread: search() can run concurrently from the
+        # MCP worker pool, and a shared out= target would corrupt scores.
+        self._scores_local = threading.local()
+        # Columnar copies of items, so search() slices parallel lists
+        # instead of doing per-item dict lookups.
+        self._type_names: list[str] | None = None
+        self._field_names: list[str] | None = None
+        self._summaries: list[str] | None = None
 
     def is_ready(self) -> bool:
-        return self.meta_path.exists() and self.vectors_path.exists()
+        return self.meta_path.exists() and (
+            self.vectors_path.exists() or self.legacy_vectors_path.exists()
+        )
+
+    def ensure_loaded(self) -> dict:
+        """Return the index metadata, reading from disk only when not cached.
+
+        save() already populates the in-memory state, so a store that just
+        built an index never pays the disk round-trip again.
+        """
+        if self._meta and self._vectors is not None and self._items is not None:
+            return self._meta
+        return self.load()
 
     def load(self) -> dict:
         if self._meta and self._vectors is not None and self._items is not None:
@@ -116,15 +252,44 @@ class EmbeddingStore:
                 f"Index not found in {self.data_dir}. Run the indexer first."
             )
 
-        self._meta = json.loads(self.meta_path.read_text())
+        raw_meta = self.meta_path.read_bytes()
+        self._meta = orjson.loads(raw_meta) if orjson else json.loads(raw_meta)
         if self._meta.get("embedding_model") != self.embedding_model:
             raise ValueError(
                 "Embedding model mismatch: "
                 f"{self._meta.get('embedding_model')} vs {self.embedding_model}"
             )
 
-        self._items = self._meta["items"]
-        self._vectors = np.load(self.vectors_path)["vectors"]
+        if "items" in self._meta:
+            # Legacy layout: items inlined in metadata.json.
+            self._items = self._meta["items"]
+        else:
+            raw_items = self.items_path.read_bytes()
+            columns = orjson.loads(raw_items) if orjson else json.loads(raw_items)
+            self._items = [
+                {"type_name": type_name, "field_name": field_name, "summary": summary}
+                for type_name, field_name, summary in zip(
+                    columns["type_name"], columns["field_name"], columns["summary"]
+                )
+            ]
+            self._meta["items"] = self._items
+        if self.vectors_path.exists():
+            self._vectors = np.load(self.vectors_path, mmap_mode="r")
+            self._vectors_int8 = (
+                np.load(self.vectors_int8_path, mmap_mode="r")
+                if self.vectors_int8_path.exists()
+                else self._quantize(self._vectors)
+            )
+        else:
+            archive = np.load(self.legacy_vectors_path)
+            self._vectors = np.ascontiguousarray(archive["vectors"], dtype=np.float32)
+            self._vectors_int8 = (
+                archive["vectors_int8"]
+                if "vectors_int8" in archive
+                else self._quantize(self._vectors)
+            )
+        self._build_columns()
+        self._load_or_build_faiss_index()
         return self._meta
 
     def save(
@@ -135,6 +300,9 @@ class EmbeddingStore:
         schema_source: dict | None = None,
     ) -> dict:
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        # Pin dtype/layout so the search matvec always hits the BLAS sgemv
+        # kernel (and the mmap'd file reloads in the same shape).
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
 
         meta = {
             "embedding_model": self.embedding_model,
@@ -144,37 +312,154 @@ class EmbeddingStore:
         if schema_source is not None:
             meta["schema_source"] = schema_source
 
-        np.savez_compressed(self.vectors_path, vectors=vectors)
-        self.meta_path.write_text(json.dumps(meta, indent=2))
+        vectors_int8 = self._quantize(vectors)
 
         self._vectors = vectors
+        self._vectors_int8 = vectors_int8
         self._items = items
         self._meta = meta
+        self._build_columns()
+        self._build_faiss_index()
+        if self._faiss_index is not None:
+            meta["faiss_index"] = self._faiss_descriptor()
+            faiss.write_index(self._faiss_index, str(self.faiss_index_path))
+
+        np.save(self.vectors_path, vectors)
+        np.save(self.vectors_int8_path, vectors_int8)
+        self.legacy_vectors_path.unlink(missing_ok=True)
+
+        # Items go to a columnar sidecar so metadata.json stays a small
+        # header that load() can parse without touching O(N) records.
+        columns = {
+            "type_name": self._type_names,
+            "field_name": self._field_names,
+            "summary": self._summaries,
+        }
+        disk_meta = {key: value for key, value in meta.items() if key != "items"}
+        if orjson:
+            self.items_path.write_bytes(orjson.dumps(columns))
+            self.meta_path.write_bytes(orjson.dumps(disk_meta, option=orjson.OPT_INDENT_2))
+        else:
+            self.items_path.write_text(json.dumps(columns))
+            self.meta_path.write_text(json.dumps(disk_meta, indent=2))
         return meta
 
+    def _build_columns(self) -> None:
+        items = self._items or []
+        self._type_names = [item["type_name"] for item in items]
+        self._field_names = [item["field_name"] for item in items]
+        self._summaries = [item["summary"] for item in items]
+
+    @classmethod
+    def _quantize(cls, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.round(vectors * cls.INT8_SCALE), -127, 127).astype(np.int8)
+
+    def _faiss_factory(self) -> str:
+        if len(self._vectors) >= self.HNSW_THRESHOLD:
+            return f"HNSW{self.HNSW_M},IP"
+        return "FlatIP"
+
+    def _faiss_descriptor(self) -> dict:
+        return {"factory": self._faiss_factory(), "dim": int(self._vectors.shape[1])}
+
+    def _load_or_build_faiss_index(self) -> None:
+        if self.quantized or faiss is None or self._vectors is None or not len(self._vectors):
+            self._faiss_index = None
+            return
+
+        stored = (self._meta or {}).get("faiss_index")
+        if self.faiss_index_path.exists() and stored == self._faiss_descriptor():
+            try:
+                index = faiss.read_index(str(self.faiss_index_path), faiss.IO_FLAG_MMAP)
+            except RuntimeError:
+                index = None
+            if index is not None and index.ntotal == len(self._vectors):
+                self._faiss_index = index
+                return
+
+        # Missing, stale, or mismatched serialized index: rebuild in memory.
+        self._build_faiss_index()
+
+    def _build_faiss_index(self) -> None:
+        if self.quantized or faiss is None or self._vectors is None or not len(self._vectors):
+            self._faiss_index = None
+            return
+        dim = int(self._vectors.shape[1])
+        if len(self._vectors) >= self.HNSW_THRESHOLD:
+            # Graph search scales sublinearly; worth the build cost once the
+            # exact scan stops fitting in cache.
+            index = faiss.IndexHNSWFlat(dim, self.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(np.ascontiguousarray(self._vectors, dtype=np.float32))
+        self._faiss_index = index
+
     def search(self, query_vector: np.ndarray, limit: int = 5) -> list[dict]:
+        """
+        Return the top-`limit` items by cosine similarity to `query_vector`.
+
+        Stored vectors and query vectors are L2-normalized (see
+        OpenAIEmbedder._normalize), so a plain inner product *is* the cosine
+        similarity — no per-query division is needed anywhere below.
+        """
         if self._vectors is None or self._items is None:
             self.load()
 
         assert self._vectors is not None and self._items is not None
+        query_vector = np.ascontiguousarray(query_vector, dtype=np.float32)
+        if __debug__:
+            assert np.isclose(float(np.linalg.norm(query_vector)), 1.0, atol=1e-3), (
+                "query_vector must be L2-normalized"
+            )
 
         limit = max(1, min(limit, len(self._items)))
-        scores = self._vectors @ query_vector
-        top_indices = np.argsort(scores)[::-1][:limit]
+
+        if self.quantized and self._vectors_int8 is not None:
+            # Score on the int8 matrix (4x less bandwidth), then rescore a
+            # small candidate pool against the float32 vectors for accuracy.
+            # einsum with an int32 accumulator casts in buffered chunks; an
+            # astype here would materialize a widened copy per query.
+            query_int8 = self._quantize(query_vector.reshape(1, -1))[0]
+            approx = np.einsum("ij,j->i", self._vectors_int8, query_int8, dtype=np.int32)
+            pool = min(len(self._items), limit * self.RERANK_FACTOR)
+            candidates = np.argpartition(approx, -pool)[-pool:]
+            scores = self._vectors[candidates] @ query_vector
+            order = np.argsort(scores)[::-1][:limit]
+            pairs = ((candidates[pos], scores[pos]) for pos in order)
+        elif self._faiss_index is not None:
+            query = np.ascontiguousarray(
+                query_vector.reshape(1, -1), dtype=np.float32
+            )
+            distances, indices = self._faiss_index.search(query, limit)
+            pairs = zip(indices[0], distances[0])
+        else:
+            buf = getattr(self._scores_local, "buf", None)
+            if buf is None or len(buf) != len(self._vectors):
+                buf = np.empty(len(self._vectors), dtype=np.float32)
+                self._scores_local.buf = buf
+            scores = np.dot(self._vectors, query_vector, out=buf)
+            candidates = np.argpartition(scores, -limit)[-limit:]
+            top_indices = candidates[np.argsort(scores[candidates])[::-1]]
+            pairs = ((idx, scores[idx]) for idx in top_indices)
 
         return [
             {
-                "type": self._items[idx]["type_name"],
-                "field": self._items[idx]["field_name"],
-                "summary": self._items[idx]["summary"],
-                "score": float(scores[idx]),
+                "type": self._type_names[idx],
+                "field": self._field_names[idx],
+                "summary": self._summaries[idx],
+                "score": float(score),
             }
-            for idx in top_indices
+            for idx, score in pairs
         ]
 
 def compute_schema_sha(schema_text: str) -> str:
     return hashlib.sha256(schema_text.encode("utf-8")).hexdigest()
 
+def compute_schema_sha_path(schema_path: Path) -> str:
+    """Hash a schema file directly: chunked reads, no full-text decode/encode."""
+    with open(schema_path, "rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
 def index_schema_text(
     schema_text: str,
     *,
@@ -183,13 +468,19 @@ def index_schema_text(
     embedder: OpenAIEmbedder | None = None,
     store: EmbeddingStore | None = None,
     schema_source: dict | None = None,
+    schema_sha: str | None = None,
 ) -> dict:
     items = flatten_schema(schema_text)
     summaries = [item.summary for item in items]
     embedder = embedder or OpenAIEmbedder(model=embed_model)
-    vectors = embedder.embed_many(summaries)
 
-    schema_sha = compute_schema_sha(schema_text)
+    # Identical summaries (common for boilerplate fields) only need to be
+    # embedded once; scatter the unique vectors back over the full list.
+    unique_summaries, inverse = np.unique(summaries, return_inverse=True)
+    vectors = embedder.embed_many(unique_summaries.tolist())[inverse]
+
+    if schema_sha is None:
+        schema_sha = compute_schema_sha(schema_text)
     store = store or EmbeddingStore(data_dir=data_dir, embedding_model=embedder.model)
     meta = store.save(
         vectors,
@@ -208,6 +499,7 @@ def index_schema(
     embedder: OpenAIEmbedder | None = None,
     store: EmbeddingStore | None = None,
     schema_source: dict | None = None,
+    schema_sha: str | None = None,
 ) -> dict:
     resolved_source = schema_source
     if resolved_source is None:
@@ -222,6 +514,7 @@ def index_schema(
         embedder=embedder,
         store=store,
         schema_source=resolved_source,
+        schema_sha=schema_sha,
     )
 
 
@@ -242,11 +535,11 @@ def ensure_index_text(
     """
     embedder = embedder or OpenAIEmbedder(model=embed_model)
     store = store or EmbeddingStore(data_dir=data_dir, embedding_model=embedder.model)
+    schema_sha = compute_schema_sha(schema_text)
 
     if not force and store.is_ready():
-        schema_sha = compute_schema_sha(schema_text)
         try:
-            meta = store.load()
+            meta = store.ensure_loaded()
         except Exception:
             return index_schema_text(
                 schema_text,
@@ -255,6 +548,7 @@ def ensure_index_text(
                 embedder=embedder,
                 store=store,
                 schema_source=schema_source,
+                schema_sha=schema_sha,
             )
 
         stored_source = meta.get("schema_source")
@@ -269,6 +563,7 @@ def ensure_index_text(
         embedder=embedder,
         store=store,
         schema_source=schema_source,
+        schema_sha=schema_sha,
     )
 
 
@@ -291,12 +586,11 @@ def ensure_index(
         schema_source = {"kind": "file", "path": str(schema_path.resolve())}
     except Exception:
         schema_source = {"kind": "file", "path": str(schema_path)}
+    schema_sha = compute_schema_sha_path(schema_path)
 
     if not force and store.is_ready():
-        schema_text = schema_path.read_text()
-        schema_sha = compute_schema_sha(schema_text)
         try:
-            meta = store.load()
+            meta = store.ensure_loaded()
         except Exception:
             return index_schema(
                 schema_path=schema_path,
@@ -305,6 +599,7 @@ def ensure_index(
                 embedder=embedder,
                 store=store,
                 schema_source=schema_source,
+                schema_sha=schema_sha,
             )
 
         stored_source = meta.get("schema_source")
@@ -319,6 +614,7 @@ def ensure_index(
         embedder=embedder,
         store=store,
         schema_source=schema_source,
+        schema_sha=schema_sha,
     )
 
 
@@ -327,11 +623,12 @@ def search_index(
     data_dir: Path = DEFAULT_DATA_DIR,
     embed_model: str = DEFAULT_EMBED_MODEL,
     embedder: OpenAIEmbedder | None = None,
+    store: EmbeddingStore | None = None,
     limit: int = 5,
 ) -> list[dict]:
     embedder = embedder or OpenAIEmbedder(model=embed_model)
-    store = EmbeddingStore(data_dir=data_dir, embedding_model=embedder.model)
-    meta = store.load()
+    store = store or EmbeddingStore(data_dir=data_dir, embedding_model=embedder.model)
+    meta = store.ensure_loaded()
 
     query_vector = embedder.embed_one(query)
     results = store.search(query_vector, limit=limit)
@@ -363,14 +660,21 @@ def cli(argv: Iterable[str] | None = None) -> int:
     # Get the selected model (either from --model or default)
     model_arg = getattr(args, 'model', DEFAULT_EMBED_MODEL)
     embedder = OpenAIEmbedder(model=model_arg)
-    
+
     if args.command == "search":
         limit = max(1, min(getattr(args, 'limit', 5), 20))
+        # Share one store between ensure and search so a freshly built
+        # index is served from memory instead of re-read from disk.
+        store = EmbeddingStore(
+            data_dir=getattr(args, 'data_dir', DEFAULT_DATA_DIR),
+            embedding_model=model_arg,
+        )
         ensure_index(
             schema_path=getattr(args, 'schema', DEFAULT_SCHEMA_PATH),
             data_dir=getattr(args, 'data_dir', DEFAULT_DATA_DIR),
             embed_model=model_arg,
             embedder=embedder,
+            store=store,
             force=False,
         )
         results = search_index(
@@ -378,6 +682,7 @@ def cli(argv: Iterable[str] | None = None) -> int:
             data_dir=getattr(args, 'data_dir', DEFAULT_DATA_DIR),
             embed_model=model_arg,
             embedder=embedder,
+            store=store,
             limit=limit
         )
         print(json.dumps(results, indent=2))
@@ -21,23 +21,47 @@ Startup notes:
 - Supports stdio/SSE/HTTP transports configured via env or CLI flags.
 """
 
+import atexit
+import functools
+import hashlib
+import heapq
 import os
 import json
+import pickle
+import queue
+import re
 import threading
+import time
 from pathlib import Path
 from typing import Literal
 from urllib.error import HTTPError
 from urllib.request import Request, urlopen
 
+import numpy as np
 from graphql import (
+    FieldNode,
+    GraphQLError,
     build_client_schema,
     build_schema,
+    execute_sync,
     get_introspection_query,
     graphql_sync,
+    parse,
     print_schema,
+    validate,
 )
 from mcp.server.fastmcp import FastMCP
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from schema_indexer import (
     DEFAULT_DATA_DIR,
     DEFAULT_EMBED_MODEL,
@@ -62,8 +86,6 @@ ENDPOINT_URL = os.environ.get("GRAPHQL_ENDPOINT_URL")
 DATA_DIR = Path(os.environ.get("GRAPHQL_EMBEDDER_DATA_DIR", str(DEFAULT_DATA_DIR)))
 EMBED_MODEL = os.environ.get("GRAPHQL_EMBED_MODEL", DEFAULT_EMBED_MODEL)
 
-embedder = OpenAIEmbedder(model=EMBED_MODEL)
-store = EmbeddingStore(data_dir=DATA_DIR, embedding_model=embedder.model)
 SCHEMA_SOURCE: dict = {"kind": "file", "path": str(SCHEMA_PATH)}
 SCHEMA_TEXT: str | None = None
 _REMOTE_HEADERS: dict[str, str] = {}
@@ -73,8 +95,64 @@ _SCALAR_TYPES = {"String", "Int", "Float", "Boolean", "ID"}
 _AGGREGATE_KEYWORDS = {"count", "total", "sum", "avg", "average", "how many", "number of"}
 _AGGREGATE_FIELD_PATTERNS = {"count", "total", "sum", "avg", "aggregate"}
 
+class _SemanticResultCache:
+    """
+    Cache of list_types results keyed by query embedding.
+
+    A lookup hits when a cached query embedding is within the cosine-similarity
+    threshold of the new one, so paraphrased queries reuse prior results that an
+    exact string cache would miss. Entries are scoped to (schema_sha, limit) and
+    evicted LRU-style.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: list[tuple[tuple, np.ndarray, list]] = []
+        # Tool calls run on concurrent worker threads; the lock keeps the
+        # LRU reorder from racing evictions on the shared entry list.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query_vector: np.ndarray, key: tuple) -> list | None:
+        with self._lock:
+            for pos, (entry_key, vector, payload) in enumerate(self._entries):
+                if entry_key != key:
+                    continue
+                if float(vector @ query_vector) >= self.threshold:
+                    self.hits += 1
+                    self._entries.append(self._entries.pop(pos))
+                    return [dict(entry) for entry in payload]
+            self.misses += 1
+            return None
+
+    def put(self, query_vector: np.ndarray, key: tuple, payload: list) -> None:
+        with self._lock:
+            self._entries.append((key, query_vector, [dict(entry) for entry in payload]))
+            if len(self._entries) > self.max_entries:
+                self._entries.pop(0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_SEMANTIC_CACHE = _SemanticResultCache()
+
+
+@functools.cache
+def _get_embedder() -> OpenAIEmbedder:
+    """Created on first use so run_query-only sessions skip OpenAI client init."""
+    return OpenAIEmbedder(model=EMBED_MODEL)
+
+
+@functools.cache
+def _get_store() -> EmbeddingStore:
+    return EmbeddingStore(data_dir=DATA_DIR, embedding_model=EMBED_MODEL)
+
 mcp = FastMCP(APP_NAME, instructions=MCP_INSTRUCTIONS)
-mcp.dependencies = ["graphql-core", "openai", "numpy"]
+mcp.dependencies = ["graphql-core", "openai", "numpy", "orjson"]
 
 
 def _run_with_default_transport(
@@ -90,15 +168,23 @@ mcp.run = _run_with_default_transport.__get__(mcp, FastMCP)
 
 
 def configure_runtime(*, schema_path: Path, data_dir: Path, embed_model: str) -> None:
-    global SCHEMA_PATH, ENDPOINT_URL, DATA_DIR, EMBED_MODEL, embedder, store, SCHEMA_SOURCE, SCHEMA_TEXT
+    global SCHEMA_PATH, ENDPOINT_URL, DATA_DIR, EMBED_MODEL, SCHEMA_SOURCE, SCHEMA_TEXT
     SCHEMA_PATH = schema_path
     ENDPOINT_URL = None
     DATA_DIR = data_dir
     EMBED_MODEL = embed_model
-    embedder = OpenAIEmbedder(model=EMBED_MODEL)
-    store = EmbeddingStore(data_dir=DATA_DIR, embedding_model=embedder.model)
+    _get_embedder.cache_clear()
+    _get_store.cache_clear()
     SCHEMA_SOURCE = {"kind": "file", "path": str(SCHEMA_PATH)}
     SCHEMA_TEXT = None
+    _SEMANTIC_CACHE.clear()
+    _tokenize.cache_clear()
+    _SCHEMA_TEXT_CACHE.clear()
+    _load_schema.cache_clear()
+    _parse_and_validate.cache_clear()
+    _parse_query.cache_clear()
+    _FIELDS_BY_TYPE_CACHE.clear()
+    _RENDER_CACHE.clear()
 
 
 def configure_runtime_endpoint(
@@ -109,15 +195,53 @@ def configure_runtime_endpoint(
     schema_text: str,
     schema_source: dict,
 ) -> None:
-    global SCHEMA_PATH, ENDPOINT_URL, DATA_DIR, EMBED_MODEL, embedder, store, SCHEMA_SOURCE, SCHEMA_TEXT
+    global SCHEMA_PATH, ENDPOINT_URL, DATA_DIR, EMBED_MODEL, SCHEMA_SOURCE, SCHEMA_TEXT
     SCHEMA_PATH = Path("<endpoint>")
     ENDPOINT_URL = endpoint_url
     DATA_DIR = data_dir
     EMBED_MODEL = embed_model
-    embedder = OpenAIEmbedder(model=EMBED_MODEL)
-    store = EmbeddingStore(data_dir=DATA_DIR, embedding_model=embedder.model)
+    _get_embedder.cache_clear()
+    _get_store.cache_clear()
     SCHEMA_SOURCE = schema_source
     SCHEMA_TEXT = schema_text
+    _SEMANTIC_CACHE.clear()
+    _tokenize.cache_clear()
+    _SCHEMA_TEXT_CACHE.clear()
+    _load_schema.cache_clear()
+    _parse_and_validate.cache_clear()
+    _parse_query.cache_clear()
+    _FIELDS_BY_TYPE_CACHE.clear()
+    _RENDER_CACHE.clear()
+
+
+# path -> (mtime, text); one os.stat per request instead of a full re-read.
+_SCHEMA_TEXT_CACHE: dict[str, tuple[float, str]] = {}
+
+
+def _get_schema_text(path: str) -> tuple[str, float]:
+    mtime = os.stat(path).st_mtime
+    cached = _SCHEMA_TEXT_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, Path(path).read_text())
+        _SCHEMA_TEXT_CACHE[path] = cached
+    return cached[1], cached[0]
+
+
+@functools.lru_cache(maxsize=4)
+def _load_schema(path: str, mtime: float):
+    cached = _SCHEMA_TEXT_CACHE.get(path)
+    text = cached[1] if cached is not None and cached[0] == mtime else Path(path).read_text()
+    return build_schema(text)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_and_validate(schema, query: str):
+    """Parse and validate once per (schema, query); repeat queries skip both phases."""
+    try:
+        document = parse(query)
+    except GraphQLError as exc:
+        return None, (exc,)
+    return document, tuple(validate(schema, document))
 
 
 def _parse_headers(raw_headers: list[str] | None) -> dict[str, str]:
@@ -134,97 +258,210 @@ def _parse_headers(raw_headers: list[str] | None) -> dict[str, str]:
     return headers
 
 
-def _post_json(url: str, payload: dict, headers: dict[str, str] | None = None, timeout_s: float = 30.0) -> dict:
-    body = json.dumps(payload).encode("utf-8")
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def _get_http_client():
+    """Shared httpx client so endpoint calls reuse pooled TCP+TLS connections."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        with _HTTP_CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                _HTTP_CLIENT = httpx.Client(timeout=_REMOTE_TIMEOUT_S)
+                atexit.register(_HTTP_CLIENT.close)
+    return _HTTP_CLIENT
+
+
+def _post_json(url: str, payload: dict | list, headers: dict[str, str] | None = None, timeout_s: float = 30.0) -> dict | list:
+    send_headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    send_headers.update(headers or {})
+
+    # orjson encodes straight to bytes and decodes bytes without an
+    # intermediate str — noticeable on MB-sized introspection responses.
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload).encode("utf-8")
+
+    def _loads(raw: bytes) -> dict | list:
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw.decode("utf-8"))
+
+    if httpx is not None:
+        resp = _get_http_client().post(url, content=body, headers=send_headers, timeout=timeout_s)
+        if resp.status_code >= 400:
+            if resp.content:
+                try:
+                    return _loads(resp.content)
+                except ValueError:
+                    return {"errors": [{"message": resp.text}]}
+            resp.raise_for_status()
+        return _loads(resp.content) if resp.content else {}
+
+    # Fallback without httpx: same wire behavior, but one connection per call.
     req = Request(url, data=body, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("Accept", "application/json")
-    for k, v in (headers or {}).items():
+    for k, v in send_headers.items():
         req.add_header(k, v)
 
     try:
         with urlopen(req, timeout=timeout_s) as resp:
-            raw = resp.read().decode("utf-8")
-            return json.loads(raw) if raw else {}
+            raw = resp.read()
+            return _loads(raw) if raw else {}
     except HTTPError as exc:
-        raw = exc.read().decode("utf-8") if exc.fp else ""
+        raw = exc.read() if exc.fp else b""
         if raw:
             try:
-                return json.loads(raw)
-            except json.JSONDecodeError:
-                return {"errors": [{"message": raw}]}
+                return _loads(raw)
+            except ValueError:
+                return {"errors": [{"message": raw.decode("utf-8", "replace")}]}
         raise
 
 
+class _BatchScheduler:
+    """
+    Coalesce concurrent endpoint POSTs into one Apollo-style batched request.
+
+    Payloads arriving within a short window are sent as a single JSON array
+    and the response array is split back to the waiting callers. Only used
+    when GRAPHQL_ENDPOINT_BATCH=1 — the endpoint must accept batched POSTs.
+    """
+
+    WINDOW_S = 0.010
+    MAX_BATCH = 20
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, url: str, payload: dict, headers: dict[str, str], timeout_s: float) -> dict:
+        self._ensure_thread()
+        done = threading.Event()
+        slot: dict = {}
+        self._queue.put((url, payload, headers, timeout_s, done, slot))
+        done.wait()
+        if "error" in slot:
+            raise slot["error"]
+        return slot["result"]
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.WINDOW_S
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: list[tuple]) -> None:
+        url, _, headers, timeout_s, _, _ = batch[0]
+        try:
+            if len(batch) == 1:
+                results = [_post_json(url, batch[0][1], headers=headers, timeout_s=timeout_s)]
+            else:
+                response = _post_json(
+                    url, [entry[1] for entry in batch], headers=headers, timeout_s=timeout_s
+                )
+                if not isinstance(response, list) or len(response) != len(batch):
+                    raise RuntimeError(
+                        "Endpoint returned a malformed batch response; "
+                        "unset GRAPHQL_ENDPOINT_BATCH if it does not support batching."
+                    )
+                results = response
+        except Exception as exc:
+            for _, _, _, _, done, slot in batch:
+                slot["error"] = exc
+                done.set()
+            return
+        for (_, _, _, _, done, slot), result in zip(batch, results):
+            slot["result"] = result
+            done.set()
+
+
+_ENDPOINT_BATCH = os.environ.get("GRAPHQL_ENDPOINT_BATCH") == "1"
+_BATCH_SCHEDULER = _BatchScheduler()
+
+
+# Built once: get_introspection_query regenerates a large string per call.
+_INTROSPECTION_PAYLOAD = {
+    "query": get_introspection_query(descriptions=True),
+    "operationName": "IntrospectionQuery",
+    "variables": {},
+}
+
+# endpoint -> (introspection data hash, SDL); re-introspecting an unchanged
+# endpoint skips the expensive build_client_schema + print_schema pass.
+_INTROSPECTED_SDL_CACHE: dict[str, tuple[str, str]] = {}
+
+
 def _introspect_schema_sdl(endpoint_url: str, headers: dict[str, str], timeout_s: float) -> str:
-    payload = {
-        "query": get_introspection_query(descriptions=True),
-        "operationName": "IntrospectionQuery",
-        "variables": {},
-    }
-    result = _post_json(endpoint_url, payload, headers=headers, timeout_s=timeout_s)
+    result = _post_json(endpoint_url, _INTROSPECTION_PAYLOAD, headers=headers, timeout_s=timeout_s)
     if result.get("errors"):
         raise RuntimeError(f"Introspection failed: {result['errors']}")
     data = result.get("data")
     if not data:
         raise RuntimeError("Introspection response missing 'data'.")
+    data_sha = hashlib.sha256(
+        json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+    cached = _INTROSPECTED_SDL_CACHE.get(endpoint_url)
+    if cached is not None and cached[0] == data_sha:
+        return cached[1]
     schema = build_client_schema(data)
-    return print_schema(schema)
-
-
-def _parse_signature(signature: str) -> tuple[str, str, list[tuple[str, str]], str]:
-    left, _, return_type = signature.partition(" -> ")
-    args: list[tuple[str, str]] = []
-    if "(" in left and left.endswith(")"):
-        base, args_str = left[:-1].split("(", 1)
-        for part in args_str.split(", "):
-            if not part:
-                continue
-            name, _, type_str = part.partition(": ")
-            if name and type_str:
-                args.append((name, type_str))
-    else:
-        base = left
-    type_name, _, field_name = base.partition(".")
+    sdl = print_schema(schema)
+    _INTROSPECTED_SDL_CACHE[endpoint_url] = (data_sha, sdl)
+    return sdl
+
+
+_SIG_RE = re.compile(r"^([^.(]+)\.([^\s(]+)(?:\(([^)]*)\))?\s*->\s*(.+)$")
+_ARG_RE = re.compile(r"([^:,\s]+): ([^,]+(?:, )?)")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_signature(signature: str) -> tuple[str, str, tuple[tuple[str, str], ...], str]:
+    match = _SIG_RE.match(signature)
+    if match is None:
+        return "", "", (), ""
+    type_name, field_name, args_str, return_type = match.groups()
+    args = tuple(
+        (name, type_str.rstrip(", "))
+        for name, type_str in _ARG_RE.findall(args_str or "")
+    )
     return type_name, field_name, args, return_type
 
 
+_TYPE_WRAPPER_RE = re.compile(r"[\[\]!\s]+")
+
+
+@functools.lru_cache(maxsize=1024)
 def _base_type(type_str: str) -> str:
-    base = type_str.strip()
-    while True:
-        base = base.rstrip("!")
-        if base.startswith("[") and base.endswith("]"):
-            base = base[1:-1].strip()
-            continue
-        return base.rstrip("!")
+    return _TYPE_WRAPPER_RE.sub("", type_str)
 
 
-def _tokenize(text: str) -> list[str]:
-    tokens = []
-    current = []
-    for ch in text.lower():
-        if ch.isalnum():
-            current.append(ch)
-        else:
-            if current:
-                token = "".join(current)
-                if token:
-                    tokens.append(token)
-                current = []
-    if current:
-        token = "".join(current)
-        if token:
-            tokens.append(token)
-    return tokens
-
-
-def _token_score(tokens: list[str], *values: str) -> int:
-    score = 0
-    haystack = " ".join(values).lower()
-    for token in tokens:
-        if token and token in haystack:
-            score += 1
-    return score
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokenize(text: str) -> tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall(text.lower()))
+
+
+def _token_score(tokens: frozenset[str], field_tokens: frozenset[str]) -> int:
+    return len(tokens & field_tokens)
 
 
 def _is_aggregate_query(query: str) -> bool:
@@ -244,6 +481,49 @@ def _is_connection_field(field_name: str) -> bool:
     return field_name.lower().endswith("connection")
 
 
+# Parsed field info per index version; rebuilt only when the index changes.
+_FIELDS_BY_TYPE_CACHE: dict[tuple, dict[str, list[dict]]] = {}
+
+
+# Parsed field info is also persisted next to the vector index so a fresh
+# process skips the O(N_fields) signature re-parse on its first list_types.
+_FIELDS_PICKLE_NAME = "fields_by_type.pkl"
+
+
+def _load_fields_pickle(key: tuple) -> dict[str, list[dict]] | None:
+    try:
+        with open(DATA_DIR / _FIELDS_PICKLE_NAME, "rb") as handle:
+            payload = pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if payload.get("key") != key:
+        return None
+    return payload.get("fields_by_type")
+
+
+def _save_fields_pickle(key: tuple, fields_by_type: dict[str, list[dict]]) -> None:
+    try:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        with open(DATA_DIR / _FIELDS_PICKLE_NAME, "wb") as handle:
+            pickle.dump({"key": key, "fields_by_type": fields_by_type}, handle)
+    except OSError:
+        pass  # best effort: the in-memory cache still works
+
+
+def _fields_by_type_for(meta: dict) -> dict[str, list[dict]]:
+    key = (meta.get("schema_sha"), len(meta.get("items", [])))
+    cached = _FIELDS_BY_TYPE_CACHE.get(key)
+    if cached is None:
+        cached = _load_fields_pickle(key)
+        if cached is None:
+            cached = _parse_field_info(meta)
+            _save_fields_pickle(key, cached)
+        _FIELDS_BY_TYPE_CACHE.clear()
+        _RENDER_CACHE.clear()
+        _FIELDS_BY_TYPE_CACHE[key] = cached
+    return cached
+
+
 def _parse_field_info(meta: dict) -> dict[str, list[dict]]:
     fields_by_type: dict[str, list[dict]] = {}
     for item in meta.get("items", []):
@@ -258,6 +538,7 @@ def _parse_field_info(meta: dict) -> dict[str, list[dict]]:
             "args": args,
             "return_type": return_type,
             "summary": summary,
+            "tokens": frozenset(_tokenize(f"{field_name} {summary}")),
         }
         fields_by_type.setdefault(type_name, []).append(info)
     return fields_by_type
@@ -270,19 +551,49 @@ def _format_args(args: list[tuple[str, str]]) -> str:
     return f"({rendered})"
 
 
+# Rendered selection sets, keyed by index version (the identity of the
+# cached fields_by_type dict) plus the render arguments. Cleared whenever
+# the field info is rebuilt.
+_RENDER_CACHE: dict[tuple, str | None] = {}
+_RENDER_CACHE_MAX = 4096
+
+
 def _render_selection_set(
     type_name: str,
     fields_by_type: dict[str, list[dict]],
-    tokens: list[str],
+    tokens: tuple[str, ...],
     depth: int = 1,
     max_fields: int = 6,
+) -> str | None:
+    cache_key = (id(fields_by_type), type_name, tokens, depth, max_fields)
+    try:
+        return _RENDER_CACHE[cache_key]
+    except KeyError:
+        pass
+    rendered = _render_selection_set_uncached(
+        type_name, fields_by_type, tokens, depth, max_fields
+    )
+    if len(_RENDER_CACHE) >= _RENDER_CACHE_MAX:
+        _RENDER_CACHE.clear()
+    _RENDER_CACHE[cache_key] = rendered
+    return rendered
+
+
+def _render_selection_set_uncached(
+    type_name: str,
+    fields_by_type: dict[str, list[dict]],
+    tokens: tuple[str, ...],
+    depth: int,
+    max_fields: int,
 ) -> str | None:
     fields = list(fields_by_type.get(type_name, []))
     if not fields:
         return None
 
+    tokens_set = frozenset(tokens)
+
     def rank(field: dict) -> tuple[int, int, str]:
-        base = _token_score(tokens, field["field_name"], field.get("summary", ""))
+        base = _token_score(tokens_set, field["tokens"])
         if field["field_name"] in {"id", "name"}:
             base += 2
         return_type = field.get("return_type", "")
@@ -318,6 +629,15 @@ def _render_selection_set(
     return "{ " + " ".join(selections) + " }"
 
 
+def _warm_index() -> None:
+    """Build/load the schema index at boot so the first tool call skips the cold start."""
+    try:
+        ensure_schema_indexed(force=False)
+        _get_store().ensure_loaded()
+    except Exception as exc:
+        print(f"Index warmup failed (will retry on first tool call): {exc}", flush=True)
+
+
 def ensure_schema_indexed(*, force: bool = False) -> dict:
     try:
         with _INDEX_LOCK:
@@ -329,16 +649,16 @@ def ensure_schema_indexed(*, force: bool = False) -> dict:
                     schema_source=SCHEMA_SOURCE,
                     data_dir=DATA_DIR,
                     embed_model=EMBED_MODEL,
-                    embedder=embedder,
-                    store=store,
+                    embedder=_get_embedder(),
+                    store=_get_store(),
                     force=force,
                 )
             return ensure_index(
                 schema_path=SCHEMA_PATH,
                 data_dir=DATA_DIR,
                 embed_model=EMBED_MODEL,
-                embedder=embedder,
-                store=store,
+                embedder=_get_embedder(),
+                store=_get_store(),
                 force=force,
             )
     except Exception as exc:
@@ -352,13 +672,39 @@ def list_types(query: str, limit: int = 20) -> list:
     Uses the persisted embedding index (auto-builds if missing/outdated).
     """
     meta = ensure_schema_indexed(force=False)
-    fields_by_type = _parse_field_info(meta)
+    capped_limit = max(1, min(limit, 20))
+    query_vec = _get_embedder().embed_one(query)
+    return _search_and_format(meta, query, query_vec, capped_limit)
+
+
+@mcp.tool()
+def list_types_batch(queries: list[str], limit: int = 5) -> list[list]:
+    """
+    Run several schema searches in one call, embedding all queries in a
+    single batched API request instead of one round-trip per query.
+    """
+    meta = ensure_schema_indexed(force=False)
+    capped_limit = max(1, min(limit, 20))
+    if not queries:
+        return []
+    query_vecs = _get_embedder().embed_many(list(queries))
+    return [
+        _search_and_format(meta, query, query_vec, capped_limit)
+        for query, query_vec in zip(queries, query_vecs)
+    ]
+
+
+def _search_and_format(meta: dict, query: str, query_vec, capped_limit: int) -> list:
+    fields_by_type = _fields_by_type_for(meta)
     tokens = _tokenize(query)
     is_aggregate = _is_aggregate_query(query)
 
-    capped_limit = max(1, min(limit, 20))
-    query_vec = embedder.embed_one(query)
-    results = store.search(query_vec, limit=capped_limit)
+    cache_key = (meta.get("schema_sha"), capped_limit)
+    cached = _SEMANTIC_CACHE.get(query_vec, cache_key)
+    if cached is not None:
+        return cached
+
+    results = _get_store().search(query_vec, limit=capped_limit)
 
     def sort_key(item: dict) -> tuple:
         """
@@ -388,7 +734,9 @@ def list_types(query: str, limit: int = 20) -> list:
                 -score,
             )
 
-    results.sort(key=sort_key)
+    # O(N log k) partial selection; the store already guarantees a float
+    # score on every result, so sort_key never falls back to the default.
+    results = heapq.nsmallest(capped_limit, results, key=sort_key)
 
     formatted = []
     for item in results:
@@ -447,9 +795,54 @@ def list_types(query: str, limit: int = 20) -> list:
 
         formatted.append(entry)
 
+    _SEMANTIC_CACHE.put(query_vec, cache_key, formatted)
     return formatted
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse_query(query: str):
+    """Parse once per distinct query; returns None on syntax errors."""
+    try:
+        return parse(query)
+    except GraphQLError:
+        return None
+
+
+# Guard rails for run_query: bound worst-case parse/execute cost so a
+# pathological query cannot stall the server or the downstream endpoint.
+_MAX_QUERY_CHARS = 50_000
+_MAX_QUERY_DEPTH = 10
+_MAX_QUERY_FIELDS = 1000
+
+
+def _query_limit_error(query: str, document) -> str | None:
+    if len(query) > _MAX_QUERY_CHARS:
+        return f"Query too large ({len(query)} chars; limit {_MAX_QUERY_CHARS})."
+    max_depth = 0
+    field_count = 0
+    # (selection_set, depth) pairs; fragments are measured from their own root.
+    stack = [
+        (definition.selection_set, 1)
+        for definition in document.definitions
+        if getattr(definition, "selection_set", None) is not None
+    ]
+    while stack:
+        selection_set, depth = stack.pop()
+        if depth > max_depth:
+            max_depth = depth
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_count += 1
+            nested = getattr(selection, "selection_set", None)
+            if nested is not None:
+                stack.append((nested, depth + 1))
+    if max_depth > _MAX_QUERY_DEPTH:
+        return f"Query nesting too deep ({max_depth} levels; limit {_MAX_QUERY_DEPTH})."
+    if field_count > _MAX_QUERY_FIELDS:
+        return f"Query selects too many fields ({field_count}; limit {_MAX_QUERY_FIELDS})."
+    return None
+
+
 @mcp.tool()
 def run_query(query: str) -> dict:
     """
@@ -459,9 +852,24 @@ def run_query(query: str) -> dict:
     this is mainly for validation and shape checking.
     """
     if ENDPOINT_URL:
+        if len(query) > _MAX_QUERY_CHARS:
+            return {
+                "valid": False,
+                "errors": [f"Query too large ({len(query)} chars; limit {_MAX_QUERY_CHARS})."],
+            }
+        document = _parse_query(query)
+        if document is not None:  # syntax errors are left to the endpoint
+            limit_error = _query_limit_error(query, document)
+            if limit_error:
+                return {"valid": False, "errors": [limit_error]}
         try:
             payload = {"query": query}
-            result = _post_json(ENDPOINT_URL, payload, headers=_REMOTE_HEADERS, timeout_s=_REMOTE_TIMEOUT_S)
+            if _ENDPOINT_BATCH:
+                result = _BATCH_SCHEDULER.submit(
+                    ENDPOINT_URL, payload, _REMOTE_HEADERS, _REMOTE_TIMEOUT_S
+                )
+            else:
+                result = _post_json(ENDPOINT_URL, payload, headers=_REMOTE_HEADERS, timeout_s=_REMOTE_TIMEOUT_S)
         except Exception as exc:
             raise RuntimeError(f"Endpoint query failed: {exc}")
         output: dict = {"valid": not bool(result.get("errors"))}
@@ -473,8 +881,25 @@ def run_query(query: str) -> dict:
             output["extensions"] = result["extensions"]
         return output
 
-    schema = build_schema(SCHEMA_PATH.read_text())
-    result = graphql_sync(schema, query)
+    # Size cap first: it exists to bound the parse/validate work below, and
+    # an oversized query must not get pinned in the parse cache either.
+    if len(query) > _MAX_QUERY_CHARS:
+        return {
+            "valid": False,
+            "errors": [f"Query too large ({len(query)} chars; limit {_MAX_QUERY_CHARS})."],
+        }
+
+    _, mtime = _get_schema_text(str(SCHEMA_PATH))
+    schema = _load_schema(str(SCHEMA_PATH), mtime)
+    document, validation_errors = _parse_and_validate(schema, query)
+    if validation_errors:
+        return {"valid": False, "errors": [str(err) for err in validation_errors]}
+
+    limit_error = _query_limit_error(query, document)
+    if limit_error:
+        return {"valid": False, "errors": [limit_error]}
+
+    result = execute_sync(schema, document)
     output = {"valid": not bool(result.errors)}
     if result.errors:
         output["errors"] = [str(err) for err in result.errors]
@@ -579,9 +1004,10 @@ if __name__ == "__main__":
         f"schema={SCHEMA_PATH}",
         flush=True,
     )
-    threading.Thread(
-        target=lambda: ensure_schema_indexed(force=False),
-        daemon=True,
-        name="graphql-mcp-indexer",
-    ).start()
+    if os.environ.get("MCP_WARMUP", "1") == "1":
+        threading.Thread(
+            target=_warm_index,
+            daemon=True,
+            name="graphql-mcp-indexer",
+        ).start()
     mcp.run(transport=args.transport, mount_path=args.mount_path)